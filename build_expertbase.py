@@ -1,7 +1,14 @@
+import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import yaml
 
 import expertbase_builder.expert
+from expertbase_builder import http_transport
+from expertbase_builder.orcid_aggregator import orcid_cache
+from expertbase_builder.memory_profiler import MemoryProfiler
 from expertbase_builder.expertbase import ExpertBase
 
 '''
@@ -21,40 +28,233 @@ console_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s
 console_handler.setFormatter(console_formatter)
 logger.addHandler(console_handler)
 
+# Die Schlüssel, die für jede Expertbase im Mehrfach-Modus konfiguriert sein müssen.
+BASE_CONFIG_KEYS = ("csv_file", "csv_extension", "output_qmd", "output_yml", "chevron_template_path",
+                    "tadirah_tooltips_path")
+
+def build_base(csv_file: str,
+               csv_extension: str,
+               output_qmd: str,
+               output_yml: str,
+               chevron_template_path: str,
+               tadirah_tooltips_path: str,
+               profiler: MemoryProfiler,
+               extra_templates: list[tuple[str, str]] | None = None) -> None:
+    """
+    Baut eine einzelne Expertbase: ORCID-Abfrage, Erweiterung der Eigenschaften, QMD-Dokumente, YAML-Datei und
+    N-Triples-Export.
+
+    Mit extra_templates können weitere Paare aus Chevron-Template und Ausgabeordner angegeben werden, etwa für eine
+    englische Detailseite oder eine Kachel. Alle Templates werden pro Experte in einem Durchgang gerendert.
+    """
+    logger.info(f"Starte die Verarbeitung der Expertbase mit der Datei: {csv_file}")
+
+    with profiler.stage("ORCID-Abfrage"):
+        expert_base = ExpertBase(csv_file, from_csv=True) # Expertbase-Objekt aus der CSV-Datei erzeugen.
+
+    #expert_base.serialize_expertbase(path="saved_base", name="backup.json") # Serialisiere die Expertbase als JSON Backup.
+
+    with profiler.stage("Eigenschaften erweitern"):
+        expert_base.add_properties_from_csv(path=csv_extension) # Ausgewählte Eigenschaften überschreiben.
+
+    # Organisationen vorab nebenläufig auflösen
+    with profiler.stage("Organisationen"):
+        expert_base.resolve_organisations()
+
+    # Für jeden Experten die QMD-Dateien aller Templates in einem Durchgang erstellen
+    render_targets = [(chevron_template_path, output_qmd)] + list(extra_templates or [])
+
+    with profiler.stage("QMD-Dokumente"):
+        for e in expert_base.get_expert_as_list():
+            e.render_qmd(targets=render_targets, tadirah_tooltips_path=tadirah_tooltips_path)
+
+    # Expertbase als YAML-Datei serialisieren
+    with profiler.stage("YAML-Datei"):
+        expert_base.parse_yml(path=output_yml)
+
+    # Expertbase als N-Triples für den Culture Knowledge Graph exportieren
+    with profiler.stage("Linked Data"):
+        expert_base.export_ntriples(path=output_yml)
+
+
 def main(csv_file: str,
          csv_extension: str,
          output_qmd: str,
          output_yml: str,
          chevron_template_path: str,
-         tadirah_tooltips_path: str) -> None:
+         tadirah_tooltips_path: str,
+         organisation_table_path: str | None = None,
+         extra_templates: list[tuple[str, str]] | None = None,
+         memory_profile: bool = False,
+         memory_budget_mb: float | None = None,
+         memory_budget_mode: str = "warn") -> None:
+    """
+    Baut die Expertbase.
+
+    Mit organisation_table_path wird eine CSV-Tabelle mit Organisationsnamen und Wikidata-QIDs in den lokalen
+    Organisationsindex geladen, sodass bekannte Organisationen und ihre Schreibvarianten ohne Wikidata-Abfrage
+    aufgelöst werden. Mit extra_templates werden weitere Paare aus Chevron-Template und Ausgabeordner im selben
+    Durchgang gerendert.
+
+    Die Speicherprofilierung ist optional: Wenn memory_profile True ist, werden nach jedem Verarbeitungsschritt die
+    Aufrufstellen mit den größten Allokationen und der Spitzenwert des RSS in das Log geschrieben. Mit memory_budget_mb
+    wird ein Speicherbudget in MiB gesetzt, bei dessen Überschreitung gewarnt ("warn") oder abgebrochen ("fail") wird.
+    """
+    profiler = MemoryProfiler(enabled=memory_profile, budget_mb=memory_budget_mb, budget_mode=memory_budget_mode)
+
     try:
-        logger.info(f"Starte die Verarbeitung der Expertbase mit der Datei: {csv_file}")
+        profiler.start()
 
         expertbase_builder.expert.Expert.tadirah_tooltips_path = tadirah_tooltips_path # Den Pfad zu den Tooltips-Texten setzen.
 
-        expert_base = ExpertBase(csv_file, from_csv=True) # Expertbase-Objekt aus der CSV-Datei erzeugen.
+        if organisation_table_path:
+            expertbase_builder.expert.Expert.organisation_index.load_table(organisation_table_path)
 
-        #expert_base.serialize_expertbase(path="saved_base", name="backup.json") # Serialisiere die Expertbase als JSON Backup.
+        build_base(csv_file=csv_file,
+                   csv_extension=csv_extension,
+                   output_qmd=output_qmd,
+                   output_yml=output_yml,
+                   chevron_template_path=chevron_template_path,
+                   tadirah_tooltips_path=tadirah_tooltips_path,
+                   profiler=profiler,
+                   extra_templates=extra_templates)
 
-        expert_base.add_properties_from_csv(path=csv_extension) # Ausgewählte Eigenschaften überschreiben.
+        http_transport.log_connection_stats()
+        expertbase_builder.expert.Expert.organisation_index.log_stats()
 
-        # Für jeden Experten eine QMD-Datei erstellen
-        for e in expert_base.get_expert_as_list():
-            e.parse_qmd(output_directory_path=output_qmd, chevron_template_path=chevron_template_path)
+    except Exception:
+        logger.error(f"Ein unerwarteter Fehler ist aufgetreten:", exc_info=True)
+        raise
 
-        # Expertbase als YAML-Datei serialisieren
-        expert_base.parse_yml(path=output_yml)
+    finally:
+        profiler.stop()
+
+
+def main_multi(config_path: str,
+               organisation_table_path: str | None = None,
+               memory_profile: bool = False,
+               memory_budget_mb: float | None = None,
+               memory_budget_mode: str = "warn") -> None:
+    """
+    Baut mehrere Expertbases in einem Prozess. Die Expertbases werden nebenläufig gebaut und teilen sich die
+    Zwischenspeicher für ORCID-Antworten, Wikidata-QIDs, Templates und Tooltip-Texte sowie die HTTP-Verbindungen.
+
+    Die Konfigurationsdatei (YAML oder JSON) hat die folgende Struktur; die Schlüssel auf oberster Ebene gelten als
+    Vorgabe für alle Expertbases und können pro Expertbase überschrieben werden:
+
+    chevron_template_path: html/expert-template.qmd\n
+    tadirah_tooltips_path: data/tadirah_tooltips.json\n
+    organisation_table_path: data/organisation_qids.csv\n
+    max_workers: 4\n
+    expertbases:\n
+      - name: hermes\n
+        csv_file: data/orcids.csv\n
+        csv_extension: data/property_extension.csv\n
+        output_qmd: outputs/hermes/expert_qmd\n
+        output_yml: outputs/hermes\n
+        extra_templates:\n
+          - chevron_template_path: html/expert-template-en.qmd\n
+            output_qmd: outputs/hermes/expert_qmd_en
+
+    Der optionale Schlüssel extra_templates listet weitere Templates, die im selben Durchgang gerendert werden.
+
+    Args:
+        config_path: Der Pfad zur Konfigurationsdatei.
+        organisation_table_path: Die Tabelle für den Organisationsindex, falls die Konfiguration keine angibt.
+        memory_profile: Wenn True, wird der Speicherverbrauch des gesamten Laufs profiliert.
+        memory_budget_mb: Das Speicherbudget in MiB für den gesamten Lauf.
+        memory_budget_mode: "warn" oder "fail".
+    """
+    profiler = MemoryProfiler(enabled=memory_profile, budget_mb=memory_budget_mb, budget_mode=memory_budget_mode)
+
+    try:
+        profiler.start()
+
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+
+        defaults = {k: v for k, v in config.items() if k in BASE_CONFIG_KEYS}
+        bases = [{**defaults, **base} for base in config.get("expertbases", [])]
+
+        for i, base in enumerate(bases):
+            base.setdefault("name", f"expertbase-{i + 1}")
+            missing = [k for k in BASE_CONFIG_KEYS if k not in base]
+            if missing:
+                raise ValueError(f"In der Konfiguration der Expertbase '{base['name']}' fehlen die Schlüssel: "
+                                 f"{', '.join(missing)}")
+
+        # Der Organisationsindex wird von allen Expertbases geteilt.
+        organisation_table_path = config.get("organisation_table_path", organisation_table_path)
+        if organisation_table_path:
+            expertbase_builder.expert.Expert.organisation_index.load_table(organisation_table_path)
+
+        logger.info(f"Starte den Bau von {len(bases)} Expertbases aus der Konfiguration {config_path}.")
+
+        # Die ORCID-Antworten werden nur für die Dauer des Laufs zwischengespeichert.
+        orcid_cache.enabled = True
+
+        failed = []
+
+        with profiler.stage("Alle Expertbases"):
+            with ThreadPoolExecutor(max_workers=config.get("max_workers", len(bases) or 1)) as executor:
+                futures = {
+                    executor.submit(build_base,
+                                    profiler=MemoryProfiler(enabled=False),
+                                    extra_templates=[(t["chevron_template_path"], t["output_qmd"])
+                                                     for t in base.get("extra_templates", [])],
+                                    **{k: base[k] for k in BASE_CONFIG_KEYS}): base["name"]
+                    for base in bases
+                }
+
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        future.result()
+                        logger.info(f"Die Expertbase '{name}' wurde erfolgreich gebaut.")
+                    except Exception:
+                        logger.error(f"Beim Bau der Expertbase '{name}' ist ein Fehler aufgetreten:", exc_info=True)
+                        failed.append(name)
+
+        http_transport.log_connection_stats()
+        orcid_cache.log_stats()
+        expertbase_builder.expert.wikidata_cache.log_stats()
+        expertbase_builder.expert.Expert.organisation_index.log_stats()
+
+        if failed:
+            raise RuntimeError(f"Die folgenden Expertbases konnten nicht gebaut werden: {', '.join(failed)}")
 
     except Exception:
         logger.error(f"Ein unerwarteter Fehler ist aufgetreten:", exc_info=True)
         raise
 
+    finally:
+        orcid_cache.clear()
+        orcid_cache.enabled = False
+        profiler.stop()
+
 
 if __name__ == "__main__":
 
+    # Optionale Speicherprofilierung und Speicherbudget über Umgebungsvariablen.
+    memory_options = {
+        "memory_profile": os.environ.get("EXPERTBASE_MEMORY_PROFILE", "").lower() in ("1", "true", "yes"),
+        "memory_budget_mb": float(os.environ["EXPERTBASE_MEMORY_BUDGET_MB"]) if os.environ.get("EXPERTBASE_MEMORY_BUDGET_MB") else None,
+        "memory_budget_mode": os.environ.get("EXPERTBASE_MEMORY_BUDGET_MODE", "warn")
+    }
+
+    # Tabelle für den lokalen Organisationsindex; standardmäßig wird die mitgelieferte Tabelle verwendet.
+    organisation_table_path = os.environ.get("EXPERTBASE_ORGANISATION_TABLE",
+                                             os.path.join(os.path.dirname(os.path.abspath(__file__)), "data",
+                                                          "organisation_qids.csv"))
+
+    # Mehrfach-Modus: python build_expertbase.py --config data/expertbases.yml
+    if len(sys.argv) == 3 and sys.argv[1] == "--config":
+        main_multi(config_path=sys.argv[2], organisation_table_path=organisation_table_path, **memory_options)
+        sys.exit(0)
+
     if not len(sys.argv) == 7:
-        logger.error("Die Zahl der übergebenen Argumente ist nicht korrekt, es werden genau 6 erwartet; übergeben wurden"
-                     f" {len(sys.argv)-1} Argumente.")
+        logger.error("Die Zahl der übergebenen Argumente ist nicht korrekt, es werden genau 6 (oder '--config <Datei>')"
+                     f" erwartet; übergeben wurden {len(sys.argv)-1} Argumente.")
         sys.exit(1)
 
     main(
@@ -63,8 +263,11 @@ if __name__ == "__main__":
         output_qmd=sys.argv[3],  # Ausgabeordner für die Detailseiten.
         output_yml=sys.argv[4], # Ausgabeordner für die yml-Datei.
         chevron_template_path=sys.argv[5], # Pfad zum Chevron-Template
-        tadirah_tooltips_path= sys.argv[6] # Pfad zur tadirah-Datei
+        tadirah_tooltips_path= sys.argv[6], # Pfad zur tadirah-Datei
+        organisation_table_path=organisation_table_path,
+        **memory_options
     )
 
     # Lokale Ausführung: python build_expertbase.py data/orcids.csv data/property_extension.csv outputs/expert_qmd outputs html/expert-template.qmd data/tadirah_tooltips.json
-    # Ausführung in der Pipeline: python Expert-Base-Builder/build_expertbase.py config/orcids.csv config/property_extension.csv Expert-Base-Builder/outputs/experts Expert-Base-Builder/outputs Expert-Base-Builder/html/expert-template.qmd Expert-Base-Builder/data/tadirah_tooltips.json
\ No newline at end of file
+    # Ausführung in der Pipeline: python Expert-Base-Builder/build_expertbase.py config/orcids.csv config/property_extension.csv Expert-Base-Builder/outputs/experts Expert-Base-Builder/outputs Expert-Base-Builder/html/expert-template.qmd Expert-Base-Builder/data/tadirah_tooltips.json
+    # Mehrfach-Modus: python build_expertbase.py --config data/expertbases.yml
@@ -2,15 +2,52 @@ import os
 import json
 import logging
 import time
+from typing import Callable
 
 import chevron
 import requests
 
+from . import http_transport
+from . import linked_data
+from .organisation_index import OrganisationIndex
+from .shared_cache import SharedCache
+
 logger = logging.getLogger(__name__)
 
+wikidata_cache = SharedCache("Wikidata")  # Gemeinsamer Zwischenspeicher für aufgelöste Wikidata-QIDs.
+template_cache = SharedCache("Templates")  # Gemeinsamer Zwischenspeicher für die Chevron-Templates.
+tooltips_cache = SharedCache("TaDiRAH-Tooltips")  # Gemeinsamer Zwischenspeicher für die Tooltip-Texte.
+
 def search_wikidata_id(search_string: str, max_retries: int = 5) -> str:
     """
-    Diese Funktion sucht die Wikidata-QID für eine Entität.
+    Diese Funktion sucht die Wikidata-QID für eine Entität. Beantwortete Suchen werden zwischengespeichert, sodass
+    mehrere Expertbases in einem Prozess dieselbe Organisation nur einmal auflösen.
+
+    Args:
+        search_string: Die Entität, nach der gesucht wird.
+        max_retries: Anzahl der Wiederholungsversuche bei 429/Serverfehlern.
+    Returns:
+        Die QID oder der Suchstring, wenn kein Eintrag gefunden wird.
+    """
+    qid = lookup_wikidata_id(search_string, max_retries)
+    return qid if qid is not None else search_string
+
+def lookup_wikidata_id(search_string: str, max_retries: int = 5) -> str | None:
+    """
+    Diese Funktion sucht die Wikidata-QID für eine Entität wie search_wikidata_id, unterscheidet aber eine
+    fehlgeschlagene Abfrage von einer Suche ohne Treffer.
+
+    Args:
+        search_string: Die Entität, nach der gesucht wird.
+        max_retries: Anzahl der Wiederholungsversuche bei 429/Serverfehlern.
+    Returns:
+        Die QID, der Suchstring, wenn kein Eintrag gefunden wird, oder None, wenn die Abfrage fehlschlägt.
+    """
+    return wikidata_cache.get_or_compute(search_string, lambda: _request_wikidata_id(search_string, max_retries))
+
+def _request_wikidata_id(search_string: str, max_retries: int = 5) -> str | None:
+    """
+    Diese Funktion fragt die Wikidata-QID für eine Entität ohne Zwischenspeicher ab.
 
     Sie respektiert die Wikidata Robot Policy:
     - Setzt einen User-Agent Header mit Kontaktinfo
@@ -20,7 +57,7 @@ def search_wikidata_id(search_string: str, max_retries: int = 5) -> str:
         search_string: Die Entität, nach der gesucht wird.
         max_retries: Anzahl der Wiederholungsversuche bei 429/Serverfehlern.
     Returns:
-        Die QID oder der Suchstring, wenn kein Eintrag gefunden wird.
+        Die QID, der Suchstring, wenn kein Eintrag gefunden wird, oder None, wenn die Abfrage fehlschlägt.
     """
     headers = {
         "User-Agent": "MyWikidataBot/1.0 (https://github.com/Nolram567/Expert-Base-Builder; mbgdevelopment@proton.me)"
@@ -38,11 +75,10 @@ def search_wikidata_id(search_string: str, max_retries: int = 5) -> str:
 
     while retries <= max_retries:
         try:
-            response = requests.get(
+            response = http_transport.get(
                 "https://www.wikidata.org/w/api.php",
                 params=params,
-                headers=headers,
-                timeout=10
+                headers=headers
             )
 
             # Falls Rate-Limit
@@ -64,13 +100,44 @@ def search_wikidata_id(search_string: str, max_retries: int = 5) -> str:
 
         except json.JSONDecodeError as e :
             logger.error(f"Die Antwort von Wikidata konnte nicht dekodiert werde: {e}.")
-            return search_string
+            return None
         except requests.RequestException as e:
             logger.error(f"Wikidata-Request fehlgeschlagen: {e}")
-            return search_string
+            return None
 
     logger.error("Maximale Anzahl an Retries erreicht.")
-    return search_string
+    return None
+
+def load_template(chevron_template_path: str) -> list[tuple[str, str]]:
+    """
+    Liest ein Chevron-Template ein und zerlegt es in Tokens. Jede Datei wird pro Prozess nur einmal gelesen und
+    tokenisiert; chevron.render nimmt die Tokenliste direkt entgegen.
+
+    Args:
+        chevron_template_path: Der Pfad zum Chevron-Template.
+    Returns:
+        Das Template als Liste von Chevron-Tokens.
+    """
+    def read() -> list[tuple[str, str]]:
+        with open(chevron_template_path, "r", encoding="utf-8") as qmd_template:
+            return list(chevron.tokenizer.tokenize(qmd_template.read()))
+
+    return template_cache.get_or_compute(os.path.abspath(chevron_template_path), read)
+
+def load_tadirah_tooltips(tadirah_tooltips_path: str) -> dict[str, str]:
+    """
+    Liest die Tooltip-Texte zu den tadirah-Schlagwörtern ein. Jede Datei wird pro Prozess nur einmal gelesen.
+
+    Args:
+        tadirah_tooltips_path: Der Pfad zur JSON-Datei mit den Tooltip-Texten.
+    Returns:
+        Die Tooltip-Texte als Dictionary.
+    """
+    def read() -> dict[str, str]:
+        with open(tadirah_tooltips_path, 'r', encoding="utf-8") as file:
+            return json.load(file)
+
+    return tooltips_cache.get_or_compute(os.path.abspath(tadirah_tooltips_path), read)
 
 class Expert:
     """
@@ -91,6 +158,7 @@ class Expert:
     """
 
     tadirah_tooltips_path = None
+    organisation_index = OrganisationIndex()  # Lokaler Index, der Organisationsnamen vor Wikidata auflöst.
 
     def __init__(self, orcid: str, data: dict):
         """
@@ -102,6 +170,7 @@ class Expert:
         """
         self.orcid = orcid
         self.properties = data
+        self._listeners = []
 
     def get_properties(self):
         """
@@ -177,7 +246,19 @@ class Expert:
     def get_organisation(self) -> list[str]:
         """
         Die Methode gibt die Organisationen zurück, an denen der Experte derzeit beschäftigt ist. Sie nutzt die wikidata
-        qid, um Duplikate in unterschiedlichen Schreibungen zu identifizieren.
+        qid, um Duplikate in unterschiedlichen Schreibungen zu identifizieren. Die Namen werden zuerst über den lokalen
+        Organisationsindex aufgelöst; nur unbekannte Namen werden bei Wikidata gesucht.
+        """
+        return list(self.get_organisation_qids().values())
+
+    def get_organisation_qids(self) -> dict[str, str]:
+        """
+        Die Methode gibt die Organisationen zurück, an denen der Experte derzeit beschäftigt ist, und bildet dabei die
+        Wikidata-QID auf die zuerst gesehene Schreibung ab. Organisationen ohne QID werden mit ihrem Namen als Schlüssel
+        aufgenommen.
+
+        Returns:
+            Ein Dictionary nach dem Muster {qid: Organisationsname, (...)}.
         """
         current_employment = self.properties.get("Derzeitige Beschäftigung", [])
         organisations = []
@@ -189,12 +270,12 @@ class Expert:
         qids = {}
 
         for organisation in organisations:
-            qid = search_wikidata_id(organisation)
+            qid = Expert.organisation_index.resolve(organisation, fallback=lookup_wikidata_id)
 
             if qid not in qids.keys():
                 qids[qid] = organisation
 
-        return list(qids.values())
+        return qids
 
     def get_research_interest(self, formated=True) -> list[str] | str:
         """
@@ -233,6 +314,25 @@ class Expert:
         else:
             return self.properties.get("TaDiRAH-Zuordnung", "")
 
+    def get_json_ld(self) -> str:
+        """
+        Diese Methode beschreibt den Experten als JSON-LD-Dokument (schema.org Person) für den Culture Knowledge Graph.
+
+        Returns:
+            Das JSON-LD-Dokument als String.
+        """
+        return linked_data.expert_to_jsonld_string(self)
+
+    def add_listener(self, listener: Callable[["Expert", str], None]) -> None:
+        """
+        Registriert eine Funktion, die nach jeder Änderung einer Eigenschaft mit dem Expertenobjekt und dem Namen der
+        Eigenschaft aufgerufen wird.
+
+        Args:
+            listener: Die aufzurufende Funktion.
+        """
+        self._listeners.append(listener)
+
     def extend_properties(self, property: str, value) -> None:
         """
         Die In-place Methode erweitert oder ersetzt die Eigenschaften des Expertenobjekts.
@@ -243,49 +343,81 @@ class Expert:
         """
         self.properties[property] = value
 
-    def parse_qmd(self, output_directory_path: str, chevron_template_path: str) -> None:
+        for listener in self._listeners:
+            listener(self, property)
+
+    def get_qmd_filename(self) -> str:
         """
-        Die Methode generiert auf der Grundlage des Expertenobjekts eine qmd-Seite für den HERMES Hub.
+        Diese Methode gibt den Dateinamen der qmd-Seite des Experten nach dem Muster 'vorname-nachname.qmd' zurück.
+        """
+        given_name, family_name = self.get_name(formated=False)
+        return (f"{given_name.lower().strip().replace(' ', '-')}"
+                f"-"
+                f"{family_name.lower().strip().replace(' ', '-')}"
+                f".qmd")
+
+    def get_render_context(self, tadirah_tooltips_path: str | None = None) -> dict[str, str]:
+        """
+        Die Methode berechnet die Werte, die in die Chevron-Templates eingesetzt werden. Der Kontext wird pro Experte
+        einmal berechnet und kann in beliebig viele Templates eingesetzt werden.
 
         Args:
-            output_directory_path: Der relative Pfad zu dem Ordner für die Ausgabe des qmd-Dokuments.
-            chevron_template_path: Der Pfad zum Chevron-Template, das für den Bau der Detailseiten verwendet werden soll.
+            tadirah_tooltips_path: Der Pfad zu den Tooltip-Texten; ohne Angabe wird Expert.tadirah_tooltips_path verwendet.
+        Returns:
+            Der Kontext als Dictionary.
+        """
+        return {
+            "expert-name": self.get_name(),
+            "orcid-domain": f"https://orcid.org/{self.get_orcid()}",
+            "current-employment": self.get_current_employment(n=3),
+            "keywords": Expert.__format_orcid_keywords(self.get_research_interest(formated=False)),
+            "tadirah": Expert.__format_tadirah_keywords(self.get_tadirah(formated=False),
+                                                        tadirah_tooltips_path or Expert.tadirah_tooltips_path),
+            "e-mail": self.get_mail(),
+            "json-ld": self.get_json_ld()
+        }
+
+    def render_qmd(self, targets: list[tuple[str, str]], tadirah_tooltips_path: str | None = None) -> None:
         """
+        Die Methode rendert das Expertenobjekt in einem Durchgang in mehrere Templates, etwa die deutsche und die
+        englische Detailseite und eine Kachel. Der Kontext wird dafür nur einmal berechnet, die Templates werden
+        zwischengespeichert.
 
-        logger.info(f"Das qmd-Dokument für {self.get_name()} wird erstellt...")
+        Args:
+            targets: Liste von Paaren aus dem Pfad zum Chevron-Template und dem Ausgabeordner.
+            tadirah_tooltips_path: Der Pfad zu den Tooltip-Texten; ohne Angabe wird Expert.tadirah_tooltips_path verwendet.
+        """
 
-        with open(chevron_template_path, "r", encoding="utf-8") as qmd_template:
-            template = qmd_template.read()
-
-        formated_research_interest = Expert.__format_orcid_keywords(self.get_research_interest(formated=False))
-        formated_tadirah = Expert.__format_tadirah_keywords(self.get_tadirah(formated=False))
-
-        formated_template = chevron.render(
-            template,
-            {
-                "expert-name": self.get_name(),
-                "orcid-domain": f"https://orcid.org/{self.get_orcid()}",
-                "current-employment": self.get_current_employment(n=3),
-                "keywords": formated_research_interest,
-                "tadirah": formated_tadirah,
-                "e-mail": self.get_mail()
-            },
-        )
+        logger.info(f"Die qmd-Dokumente für {self.get_name()} werden erstellt...")
 
-        output_path = os.path.join(output_directory_path,
-                            f"{self.get_name(formated=False)[0].lower().strip().replace(" ", "-")}"
-                            f"-"
-                            f"{self.get_name(formated=False)[1].lower().strip().replace(" ", "-")}"
-                            f".qmd")
+        context = self.get_render_context(tadirah_tooltips_path)
+        filename = self.get_qmd_filename()
 
-        os.makedirs(output_directory_path, exist_ok=True)
+        for chevron_template_path, output_directory_path in targets:
+            formated_template = chevron.render(load_template(chevron_template_path), context)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(formated_template)
+            output_path = os.path.join(output_directory_path, filename)
 
-        logger.info(
-            f"Das qmd-Dokument für {self.get_name()} wurde erstellt und unter {output_path} gespeichert..."
-        )
+            os.makedirs(output_directory_path, exist_ok=True)
+
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(formated_template)
+
+            logger.info(
+                f"Das qmd-Dokument für {self.get_name()} wurde erstellt und unter {output_path} gespeichert..."
+            )
+
+    def parse_qmd(self, output_directory_path: str, chevron_template_path: str,
+                  tadirah_tooltips_path: str | None = None) -> None:
+        """
+        Die Methode generiert auf der Grundlage des Expertenobjekts eine qmd-Seite für den HERMES Hub.
+
+        Args:
+            output_directory_path: Der relative Pfad zu dem Ordner für die Ausgabe des qmd-Dokuments.
+            chevron_template_path: Der Pfad zum Chevron-Template, das für den Bau der Detailseiten verwendet werden soll.
+            tadirah_tooltips_path: Der Pfad zu den Tooltip-Texten; ohne Angabe wird Expert.tadirah_tooltips_path verwendet.
+        """
+        self.render_qmd([(chevron_template_path, output_directory_path)], tadirah_tooltips_path)
 
     @staticmethod
     def __format_orcid_keywords(keywords: list[str]) -> str:
@@ -314,20 +446,20 @@ class Expert:
         return f'<abbr data-tooltip="{tip}">{keyword}</abbr>'
 
     @staticmethod
-    def __format_tadirah_keywords(keywords: list[str]) -> str:
+    def __format_tadirah_keywords(keywords: list[str], tadirah_tooltips_path: str) -> str:
         """
         Die Helfermethode baut und formatiert das div-Element für die tadirah-Schlagworte auf der Personenseite.
 
         Args:
             keywords: Die tadirah-Schlagworte als Liste von Strings.
+            tadirah_tooltips_path: Der Pfad zur JSON-Datei mit den Tooltip-Texten.
         Returns:
             Die tadirah Keywords als HTML Markup für die Personenseite.
         """
         if len(keywords) == 1 and "," in keywords[0]:
             keywords = [k.strip() for k in keywords[0].split(",")]
 
-        with open(Expert.tadirah_tooltips_path, 'r', encoding="utf-8") as file:
-            tooltips = json.load(file)
+        tooltips = load_tadirah_tooltips(tadirah_tooltips_path)
 
         builder = ['<div class="tadirah-keywords">']
         builder.extend(f'<span class="tag-tadirah-detail">{Expert.__format_tooltip(word, tooltips.get(word, ""))}</span>' for word in keywords)
@@ -1,13 +1,39 @@
 import os
 import json
 import logging
+import unicodedata
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
 
+from . import http_transport
 from .orcid_aggregator import *
-from .expert import Expert
+from .expert import Expert, lookup_wikidata_id
+from .linked_data import expert_to_ntriples, split_terms
+from .organisation_index import QID_PATTERN
 import yaml
 
 logger = logging.getLogger(__name__)
 
+# Die Eigenschaften, deren Änderung die Indizes der Expertbase betrifft.
+KEYWORD_PROPERTY = "Forschungsinteressen"
+TADIRAH_PROPERTY = "TaDiRAH-Zuordnung"
+FAMILY_NAME_PROPERTY = "Nachname"
+EMPLOYMENT_PROPERTY = "Derzeitige Beschäftigung"
+
+def normalize_term(term: str) -> str:
+    """
+    Normalisiert ein Schlagwort oder einen Namen für die Indizes der Expertbase: Groß- und Kleinschreibung, Diakritika
+    und mehrfacher Leerraum werden vereinheitlicht.
+
+    Args:
+        term: Das Schlagwort oder der Name.
+    Returns:
+        Die normalisierte Schreibung.
+    """
+    term = unicodedata.normalize("NFKD", term)
+    term = "".join(c for c in term if not unicodedata.combining(c))
+    return " ".join(term.casefold().split())
+
 def create_tadirah_map(file_path: str) -> dict:
     """
     Erstellt ein Dictionary, das die Orcids in der übergebenen Datei auf die korrespondierenden tadirah-Schlagwörter
@@ -41,6 +67,10 @@ class ExpertBase:
     {orcid: Objekt der Klasse Experte,
     (...)
     }
+
+    Für Abfragen mit find_experts werden Sekundärindizes nach normalisiertem Keyword, TaDiRAH-Schlagwort, Organisation
+    (QID, sobald aufgelöst) und Nachname gepflegt. Die Indizes werden aktualisiert, sobald sich die Eigenschaften eines
+    Experten über extend_properties ändern; der Organisationsindex wird erst bei der ersten Abfrage aufgelöst.
     """
 
     def __init__(self, filename: str, from_csv: bool = True):
@@ -55,6 +85,14 @@ class ExpertBase:
         self.raw_base = {}
         self.base = {}
 
+        self._positions = {}
+        self._keyword_index = {}
+        self._tadirah_index = {}
+        self._organisation_index = {}
+        self._family_names = []
+        self._indexed = {}
+        self._organisation_dirty = set()
+
         if from_csv:
             self.populate_from_csv(filename)
         else:
@@ -76,11 +114,7 @@ class ExpertBase:
 
         logger.info(f"Das ExpertBase-Objekt wird mit den ORCID's aus {path} befüllt.")
 
-        for orcid in orcids:
-            logger.info(f"Abfrage von ORCID {orcid}...")
-            person_endpoint_data = fetch_orcid_data(orcid, endpoint="person")
-            activities_endpoint_data = fetch_orcid_data(orcid, endpoint="activities")
-
+        for orcid, person_endpoint_data, activities_endpoint_data in fetch_orcid_records(orcids):
 
             if person_endpoint_data is None or activities_endpoint_data is None:
                 logger.error(f"Fehler beim Abrufen von Daten oder leere Antwort für ORCID {orcid}")
@@ -101,11 +135,188 @@ class ExpertBase:
                                     "TaDiRAH-Zuordnung": tadirah_map[orcid]
                                 })
 
-            self.base[orcid] = new_expert
+            self._add_expert(new_expert)
             self.raw_base[orcid] = new_expert.get_properties()
 
         logger.info(f"Das Expertbase-Objekt wurde erfolgreich mit den ORCID's aus {path} befüllt.")
 
+    def resolve_organisations(self) -> None:
+        """
+        Diese Methode löst die Organisationen aller Experten nebenläufig auf, bevor die Ausgabedateien erzeugt werden.
+        Die Ergebnisse liegen danach im Organisationsindex und im Wikidata-Zwischenspeicher; die Zahl der gleichzeitigen
+        Anfragen an Wikidata steuert die HTTP-Transportschicht.
+        """
+        logger.info("Die Organisationen der Experten werden aufgelöst.")
+
+        with ThreadPoolExecutor(max_workers=http_transport.MAX_CONCURRENCY) as executor:
+            list(executor.map(Expert.get_organisation_qids, self.get_expert_as_list()))
+
+        logger.info("Die Organisationen der Experten wurden aufgelöst.")
+
+    def _add_expert(self, expert: Expert) -> None:
+        """
+        Fügt ein Expertenobjekt in die Expertbase und in die Indizes ein.
+
+        Args:
+            expert: Das Expertenobjekt.
+        """
+        orcid = expert.get_orcid()
+
+        if orcid in self.base:
+            self._unindex(orcid, (KEYWORD_PROPERTY, TADIRAH_PROPERTY, FAMILY_NAME_PROPERTY, EMPLOYMENT_PROPERTY))
+        else:
+            self._positions[orcid] = len(self._positions)
+
+        self.base[orcid] = expert
+        expert.add_listener(self._on_expert_changed)
+        self._indexed[orcid] = {}
+        self._index(orcid, (KEYWORD_PROPERTY, TADIRAH_PROPERTY, FAMILY_NAME_PROPERTY, EMPLOYMENT_PROPERTY))
+
+    def _on_expert_changed(self, expert: Expert, property: str) -> None:
+        """
+        Aktualisiert die Indizes, nachdem sich eine Eigenschaft eines Experten geändert hat.
+
+        Args:
+            expert: Das geänderte Expertenobjekt.
+            property: Der Name der geänderten Eigenschaft.
+        """
+        orcid = expert.get_orcid()
+
+        if self.base.get(orcid) is not expert:
+            return
+
+        self._unindex(orcid, (property,))
+        self._index(orcid, (property,))
+
+    def _index(self, orcid: str, properties: tuple[str, ...]) -> None:
+        """
+        Trägt die angegebenen Eigenschaften eines Experten in die Indizes ein.
+
+        Args:
+            orcid: Die ORCID des Experten.
+            properties: Die Namen der Eigenschaften, die indiziert werden sollen.
+        """
+        expert = self.base[orcid]
+        indexed = self._indexed[orcid]
+
+        if KEYWORD_PROPERTY in properties:
+            keywords = {normalize_term(k) for k in split_terms(expert.get_research_interest(formated=False))}
+            for keyword in keywords:
+                self._keyword_index.setdefault(keyword, set()).add(orcid)
+            indexed[KEYWORD_PROPERTY] = keywords
+
+        if TADIRAH_PROPERTY in properties:
+            terms = {normalize_term(t) for t in split_terms(expert.get_tadirah(formated=False))}
+            for term in terms:
+                self._tadirah_index.setdefault(term, set()).add(orcid)
+            indexed[TADIRAH_PROPERTY] = terms
+
+        if FAMILY_NAME_PROPERTY in properties:
+            family_name = normalize_term(expert.get_name(formated=False)[1])
+            insort(self._family_names, (family_name, orcid))
+            indexed[FAMILY_NAME_PROPERTY] = family_name
+
+        if EMPLOYMENT_PROPERTY in properties:
+            self._organisation_dirty.add(orcid)
+
+    def _unindex(self, orcid: str, properties: tuple[str, ...]) -> None:
+        """
+        Entfernt die angegebenen Eigenschaften eines Experten aus den Indizes.
+
+        Args:
+            orcid: Die ORCID des Experten.
+            properties: Die Namen der Eigenschaften, die entfernt werden sollen.
+        """
+        indexed = self._indexed[orcid]
+
+        for property, index in ((KEYWORD_PROPERTY, self._keyword_index),
+                                (TADIRAH_PROPERTY, self._tadirah_index),
+                                (EMPLOYMENT_PROPERTY, self._organisation_index)):
+            if property not in properties:
+                continue
+            for key in indexed.pop(property, ()):
+                index[key].discard(orcid)
+                if not index[key]:
+                    del index[key]
+
+        if FAMILY_NAME_PROPERTY in properties and FAMILY_NAME_PROPERTY in indexed:
+            entry = (indexed.pop(FAMILY_NAME_PROPERTY), orcid)
+            position = bisect_left(self._family_names, entry)
+            if position < len(self._family_names) and self._family_names[position] == entry:
+                del self._family_names[position]
+
+    def _refresh_organisation_index(self) -> None:
+        """
+        Löst die Organisationen aller Experten auf, deren Beschäftigung sich seit der letzten Abfrage geändert hat, und
+        trägt sie in den Organisationsindex ein.
+        """
+        while self._organisation_dirty:
+            orcid = self._organisation_dirty.pop()
+            if orcid not in self.base:
+                continue
+
+            keys = set(self.base[orcid].get_organisation_qids().keys())
+            for key in keys:
+                self._organisation_index.setdefault(key, set()).add(orcid)
+            self._indexed[orcid][EMPLOYMENT_PROPERTY] = keys
+
+    def _family_name_prefix(self, prefix: str) -> set[str]:
+        """
+        Gibt die ORCIDs aller Experten zurück, deren normalisierter Nachname mit dem Präfix beginnt.
+        """
+        prefix = normalize_term(prefix)
+        result = set()
+
+        for family_name, orcid in self._family_names[bisect_left(self._family_names, (prefix, "")):]:
+            if not family_name.startswith(prefix):
+                break
+            result.add(orcid)
+
+        return result
+
+    def find_experts(self,
+                     keyword: str | list[str] | None = None,
+                     tadirah: str | list[str] | None = None,
+                     organisation: str | list[str] | None = None,
+                     family_name_prefix: str | None = None) -> list[Expert]:
+        """
+        Die Methode sucht Experten über die Indizes der Expertbase. Alle angegebenen Filter werden kombiniert; werden
+        für einen Filter mehrere Werte angegeben, müssen alle zutreffen.
+
+        Args:
+            keyword: Ein oder mehrere ORCID-Keywords.
+            tadirah: Ein oder mehrere TaDiRAH-Schlagwörter.
+            organisation: Eine oder mehrere Organisationen als Name oder Wikidata-QID.
+            family_name_prefix: Der Anfang des Nachnamens.
+        Returns:
+            Die passenden Experten in der Reihenfolge der Expertbase.
+        """
+        candidates = []
+
+        for values, index in ((keyword, self._keyword_index), (tadirah, self._tadirah_index)):
+            for value in [values] if isinstance(values, str) else values or []:
+                candidates.append(index.get(normalize_term(value), set()))
+
+        if organisation:
+            self._refresh_organisation_index()
+            for value in [organisation] if isinstance(organisation, str) else organisation:
+                key = value if QID_PATTERN.match(value) else \
+                    Expert.organisation_index.resolve(value, fallback=lookup_wikidata_id)
+                candidates.append(self._organisation_index.get(key, set()))
+
+        if family_name_prefix:
+            candidates.append(self._family_name_prefix(family_name_prefix))
+
+        if not candidates:
+            return self.get_expert_as_list()
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for candidate in candidates[1:]:
+            result &= candidate
+
+        return [self.base[orcid] for orcid in sorted(result, key=self._positions.get)]
+
     def get_base(self) -> dict:
         """
         Gibt eine einfache Kopie der Objektvariable base zurück.
@@ -146,7 +357,7 @@ class ExpertBase:
                                         "E-Mail": expert.get("E-Mail", "")
                                     })
 
-                self.base[orcid] = new_expert
+                self._add_expert(new_expert)
 
             logger.info(f"Das Expertbase-Objekt wurde erfolgreich von {path} eingelesen.")
 
@@ -213,6 +424,28 @@ class ExpertBase:
 
         logger.info(f"Das Expertbase-Objekt wurde erfolgreich zu einer YAML-Datei geparst und unter {path} gespeichert.")
 
+    def export_ntriples(self, path: str, filename: str = "expertbase.nt", graph: str | None = None) -> None:
+        """
+        Diese Methode exportiert die Expertbase als Linked Data für den Culture Knowledge Graph. Die Tripel werden
+        Experte für Experte in die Datei geschrieben, ohne den Graphen im Speicher aufzubauen.
+
+        Args:
+            path: Der Ordner für die Ausgabedatei.
+            filename: Der Name der Ausgabedatei.
+            graph: Die IRI des benannten Graphen; wenn angegeben, wird die Datei im Format N-Quads geschrieben.
+        """
+
+        logger.info(f"Das Expertbase-Objekt wird als {'N-Quads' if graph else 'N-Triples'} exportiert.")
+
+        os.makedirs(path, exist_ok=True)
+        seen_nodes = set()
+
+        with open(os.path.join(path, filename), "w", encoding="utf-8") as f:
+            for expert in self.get_expert_as_list():
+                f.writelines(expert_to_ntriples(expert, graph=graph, seen_nodes=seen_nodes))
+
+        logger.info(f"Das Expertbase-Objekt wurde erfolgreich als Linked Data unter {path} gespeichert.")
+
     def add_properties_from_csv(self, path: str) -> None:
         """
         Mit dieser In-place Methode können die Eigenschaften der Experten in der Expertbase erweitert oder
@@ -0,0 +1,328 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+'''
+Gemeinsame HTTP-Transportschicht für die ORCID- und Wikidata-Abfragen.
+
+Für jeden Host wird eine eigene requests.Session mit einem Pool von Keep-Alive-Verbindungen gehalten, sodass
+TCP- und TLS-Handshakes nur einmal pro Verbindung anfallen. Alle Anfragen handeln komprimierte Antworten aus, haben
+Verbindungs- und Lese-Timeouts und teilen sich eine Retry-Strategie für Serverfehler (5xx) und Verbindungsfehler.
+
+Die Zahl der gleichzeitigen Anfragen pro Host wird von einem AdaptiveLimiter nach dem AIMD-Verfahren gesteuert: Solange
+Latenz und Fehlerrate unauffällig sind, steigt die Parallelität langsam an; bei 429, 5xx, Verbindungsfehlern oder
+Latenzspitzen wird sie halbiert.
+'''
+
+CONNECT_TIMEOUT = 5  # Sekunden
+READ_TIMEOUT = 30  # Sekunden
+MAX_RETRIES = 3
+
+INITIAL_CONCURRENCY = 2  # Anfängliche Zahl gleichzeitiger Anfragen pro Host
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 16  # Obergrenze der gleichzeitigen Anfragen pro Host
+POOL_MAXSIZE = MAX_CONCURRENCY  # Maximale Zahl an Keep-Alive-Verbindungen pro Host
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+_connection_stats: dict[str, dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+_limiters: dict[str, "AdaptiveLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+class AdaptiveLimiter:
+    """
+    Objekte dieser Klasse begrenzen die Zahl der gleichzeitigen Anfragen an einen Host und passen die Grenze nach dem
+    AIMD-Verfahren (additive increase, multiplicative decrease) an die beobachteten Antworten an.
+
+    Für jede gesunde Antwort bei ausgeschöpfter Grenze steigt die Grenze um 1/Grenze, also um etwa eins pro Runde. Bei
+    429, 5xx, Verbindungsfehlern oder einer Latenz über dem spike_factor-fachen des gleitenden Mittels wird die Grenze
+    halbiert, höchstens einmal pro cooldown Sekunden und nicht unter das Minimum. Das gleitende Mittel umfasst alle
+    erfolgreichen Antworten, sodass ein dauerhaft höheres Latenzniveau nach kurzer Zeit nicht mehr als Spitze gilt.
+    Jede Änderung der Grenze wird in das Log geschrieben.
+    """
+
+    def __init__(self, host: str, initial: int = INITIAL_CONCURRENCY, minimum: int = MIN_CONCURRENCY,
+                 maximum: int = MAX_CONCURRENCY, spike_factor: float = 3.0, cooldown: float = 1.0):
+        """
+        Der Konstruktor der Klasse.
+
+        Args:
+            host: Der Host, für den die Grenze gilt.
+            initial: Die anfängliche Zahl gleichzeitiger Anfragen.
+            minimum: Die kleinste zulässige Grenze.
+            maximum: Die größte zulässige Grenze.
+            spike_factor: Das Vielfache der mittleren Latenz, ab dem eine Antwort als Latenzspitze gilt.
+            cooldown: Die Mindestzeit in Sekunden zwischen zwei Halbierungen.
+        """
+        self.host = host
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.spike_factor = spike_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.latency = None  # Gleitendes Mittel der Latenz gesunder Antworten in Sekunden
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Wartet, bis eine weitere Anfrage an den Host gestellt werden darf.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        """
+        Gibt den Platz einer abgeschlossenen Anfrage frei.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def record(self, status: int | None, latency: float) -> None:
+        """
+        Passt die Grenze an eine beobachtete Antwort an.
+
+        Args:
+            status: Der HTTP-Statuscode oder None bei einem Verbindungsfehler.
+            latency: Die Dauer der Anfrage in Sekunden.
+        """
+        with self._condition:
+            previous = int(self.limit)
+
+            if status is None or status == 429 or status >= 500:
+                self._decrease(f"HTTP-Statuscode {status}" if status else "Verbindungsfehler")
+                self._condition.notify_all()
+                return
+
+            spike = self._samples >= 5 and latency > self.spike_factor * self.latency
+
+            # Jede erfolgreiche Antwort geht in das Mittel ein, damit es einem dauerhaft höheren Niveau folgt.
+            self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+            self._samples += 1
+
+            if spike:
+                self._decrease(f"Latenzspitze {latency:.2f} s (Mittel {self.latency:.2f} s)")
+            elif self.in_flight >= int(self.limit):
+                # Die Grenze wächst nur, wenn sie tatsächlich ausgeschöpft ist.
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                if int(self.limit) > previous:
+                    logger.info(f"Parallelität für {self.host} auf {int(self.limit)} erhöht "
+                                f"(mittlere Latenz {self.latency:.2f} s).")
+
+            self._condition.notify_all()
+
+    def _decrease(self, reason: str) -> None:
+        """
+        Halbiert die Grenze, sofern sie über dem Minimum liegt und seit der letzten Halbierung die Mindestzeit vergangen
+        ist; der Aufrufer hält die Sperre.
+        """
+        now = time.monotonic()
+        if self.limit <= self.minimum or now - self._last_decrease < self.cooldown:
+            return
+
+        self._last_decrease = now
+        previous = int(self.limit)
+        self.limit = max(float(self.minimum), self.limit / 2)
+        if int(self.limit) < previous:
+            logger.warning(f"Parallelität für {self.host} wegen {reason} von {previous} auf {int(self.limit)} "
+                           f"gesenkt.")
+
+
+def get_limiter(host: str) -> AdaptiveLimiter:
+    """
+    Gibt den AdaptiveLimiter für einen Host zurück und legt ihn bei Bedarf an.
+
+    Args:
+        host: Der Hostname, etwa "pub.orcid.org".
+    Returns:
+        Der Limiter, den sich alle Anfragen an diesen Host teilen.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveLimiter(host)
+            _limiters[host] = limiter
+        return limiter
+
+
+def _record_connection(host: str, reused: bool) -> None:
+    """
+    Zählt eine Anfrage an einen Host als neue oder wiederverwendete Verbindung.
+
+    Args:
+        host: Der Host, an den die Anfrage gestellt wurde.
+        reused: True, wenn eine bestehende Keep-Alive-Verbindung verwendet wurde.
+    """
+    with _stats_lock:
+        stats = _connection_stats.setdefault(host, {"new": 0, "reused": 0})
+        stats["reused" if reused else "new"] += 1
+
+
+class _CountingPoolMixin:
+    """
+    Mixin für die urllib3-Verbindungspools, das für jeden einzelnen Request (auch für Wiederholungsversuche) festhält,
+    ob dafür eine neue Verbindung aufgebaut werden musste, und Statuscode und Latenz an den AdaptiveLimiter meldet.
+    """
+
+    def _make_request(self, conn, *args, **kwargs):
+        _record_connection(self.host, reused=getattr(conn, "sock", None) is not None)
+        limiter = get_limiter(self.host)
+        start = time.monotonic()
+
+        try:
+            response = super()._make_request(conn, *args, **kwargs)
+        except Exception:
+            limiter.record(None, time.monotonic() - start)
+            raise
+
+        limiter.record(response.status, time.monotonic() - start)
+        return response
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter, der die zählenden Verbindungspools verwendet.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+def _build_retry() -> Retry:
+    """
+    Erstellt die gemeinsame Retry-Strategie für Serverfehler und Verbindungsfehler.
+
+    Der Statuscode 429 ist bewusst ausgenommen, da die Aufrufer das Rate-Limit selbst behandeln.
+    """
+    return Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+def _create_session() -> requests.Session:
+    """
+    Erstellt eine neue Session mit Verbindungspool, Retry-Strategie und Standard-Headern.
+    """
+    session = requests.Session()
+    adapter = _PooledAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=_build_retry())
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_session(host: str) -> requests.Session:
+    """
+    Gibt die Session für einen Host zurück und legt sie bei Bedarf an.
+
+    Args:
+        host: Der Hostname, etwa "pub.orcid.org".
+    Returns:
+        Die Session, die sich alle Anfragen an diesen Host teilen.
+    """
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _create_session()
+            _sessions[host] = session
+        return session
+
+
+def get(url: str, params: dict | None = None, headers: dict | None = None,
+        timeout: tuple[float, float] | None = None) -> requests.Response:
+    """
+    Führt eine GET-Anfrage über die gepoolte Session des jeweiligen Hosts aus. Die Anfrage wartet, bis der
+    AdaptiveLimiter des Hosts eine weitere gleichzeitige Anfrage zulässt.
+
+    Args:
+        url: Die URL, die abgefragt werden soll.
+        params: Query-Parameter der Anfrage.
+        headers: Zusätzliche Header, die die Standard-Header ergänzen oder überschreiben.
+        timeout: Tupel aus Verbindungs- und Lese-Timeout in Sekunden.
+    Returns:
+        Die Antwort als requests.Response.
+    Raises:
+        requests.RequestException: Wenn die Anfrage auch nach allen Wiederholungsversuchen fehlschlägt.
+    """
+    host = urlsplit(url).hostname
+    session = get_session(host)
+    limiter = get_limiter(host)
+
+    limiter.acquire()
+    try:
+        return session.get(url,
+                           params=params,
+                           headers=headers,
+                           timeout=timeout or (CONNECT_TIMEOUT, READ_TIMEOUT))
+    finally:
+        limiter.release()
+
+
+def get_connection_stats() -> dict[str, dict[str, int]]:
+    """
+    Gibt die Zahl der neu aufgebauten und der wiederverwendeten Verbindungen pro Host zurück.
+    """
+    with _stats_lock:
+        return {host: stats.copy() for host, stats in _connection_stats.items()}
+
+
+def log_connection_stats() -> None:
+    """
+    Schreibt die Verbindungsstatistik pro Host in das Log.
+    """
+    for host, stats in get_connection_stats().items():
+        total = stats["new"] + stats["reused"]
+        logger.info(f"HTTP-Verbindungen zu {host}: {total} Anfragen, {stats['new']} neue Verbindungen, "
+                    f"{stats['reused']} wiederverwendet, Parallelität zuletzt {int(get_limiter(host).limit)}.")
+
+
+def close_sessions() -> None:
+    """
+    Schließt alle offenen Sessions und deren Verbindungspools.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,195 @@
+import json
+import re
+from typing import TYPE_CHECKING, Iterator
+
+from .organisation_index import QID_PATTERN
+
+if TYPE_CHECKING:
+    from .expert import Expert
+
+'''
+Export der Expertbase als Linked Data für den Culture Knowledge Graph.
+
+Jeder Experte wird als schema:Person mit der ORCID-URL als IRI beschrieben. Organisationen werden, sofern eine
+Wikidata-QID bekannt ist, über die Wikidata-IRI referenziert, ORCID-Keywords als schema:knowsAbout angegeben und die
+TaDiRAH-Zuordnungen als schema:DefinedTerm aus dem TaDiRAH-Vokabular.
+
+Der JSON-LD-Kontext und die Prädikat-IRIs werden einmal beim Import vorberechnet und von allen Datensätzen geteilt,
+sodass pro Experte nur dessen eigene Werte serialisiert werden.
+'''
+
+SCHEMA = "http://schema.org/"
+WIKIDATA_ENTITY = "http://www.wikidata.org/entity/"
+ORCID_DOMAIN = "https://orcid.org/"
+TADIRAH_VOCABULARY = "https://vocabs.dariah.eu/tadirah/"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+JSONLD_CONTEXT = {
+    "@vocab": SCHEMA,
+    "wd": WIKIDATA_ENTITY,
+    "orcid": ORCID_DOMAIN,
+}
+
+# Vorberechnete Serialisierungen, die von allen Datensätzen geteilt werden.
+_CONTEXT_JSON = json.dumps(JSONLD_CONTEXT, ensure_ascii=False)
+_IRI = {
+    name: f"<{SCHEMA}{name}>"
+    for name in ("Person", "Organization", "DefinedTerm", "name", "givenName", "familyName", "email", "identifier",
+                 "affiliation", "knowsAbout", "inDefinedTermSet")
+}
+_RDF_TYPE = f"<{RDF_TYPE}>"
+_TADIRAH_SET = f"<{TADIRAH_VOCABULARY}>"
+
+_LITERAL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+_BLANK_NODE_INVALID = re.compile(r"[^A-Za-z0-9]+")
+
+
+def split_terms(values: list[str] | str) -> list[str]:
+    """
+    Vereinheitlicht Schlagwörter, die als Liste oder (aus der Erweiterungsdatei) als kommagetrennter String vorliegen.
+
+    Args:
+        values: Die Schlagwörter als Liste oder String.
+    Returns:
+        Die Schlagwörter als Liste ohne leere Einträge.
+    """
+    if isinstance(values, str):
+        values = [values]
+
+    if len(values) == 1 and "," in values[0]:
+        values = values[0].split(",")
+
+    return [v.strip() for v in values if v and v.strip()]
+
+
+def _literal(value: str) -> str:
+    """
+    Serialisiert einen String als N-Triples-Literal.
+    """
+    return f'"{value.translate(_LITERAL_ESCAPES)}"'
+
+
+def _organisation_iri(key: str) -> str | None:
+    """
+    Gibt die Wikidata-IRI für einen Organisationsschlüssel zurück oder None, wenn der Schlüssel keine QID ist.
+    """
+    return f"{WIKIDATA_ENTITY}{key}" if QID_PATTERN.match(key) else None
+
+
+def _tadirah_node(term: str) -> str:
+    """
+    Gibt den Blank Node für ein TaDiRAH-Schlagwort zurück. Derselbe Begriff erhält in einem Dokument denselben Knoten.
+    """
+    return f"_:tadirah-{_BLANK_NODE_INVALID.sub('-', term).strip('-').lower()}"
+
+
+def expert_to_jsonld(expert: "Expert") -> dict:
+    """
+    Beschreibt einen Experten als JSON-LD-Objekt ohne Kontext.
+
+    Args:
+        expert: Das Expertenobjekt.
+    Returns:
+        Das JSON-LD-Objekt als Dictionary.
+    """
+    given_name, family_name = expert.get_name(formated=False)
+    orcid_iri = f"{ORCID_DOMAIN}{expert.get_orcid()}"
+
+    node = {
+        "@id": orcid_iri,
+        "@type": "Person",
+        "name": expert.get_name(),
+        "givenName": given_name,
+        "familyName": family_name,
+        "identifier": expert.get_orcid(),
+    }
+
+    if expert.get_mail():
+        node["email"] = expert.get_mail()
+
+    affiliations = []
+    for key, name in expert.get_organisation_qids().items():
+        organisation = {"@type": "Organization", "name": name}
+        iri = _organisation_iri(key)
+        if iri:
+            organisation["@id"] = iri
+        affiliations.append(organisation)
+    if affiliations:
+        node["affiliation"] = affiliations
+
+    knows_about = split_terms(expert.get_research_interest(formated=False))
+    knows_about.extend({"@type": "DefinedTerm", "name": term, "inDefinedTermSet": {"@id": TADIRAH_VOCABULARY}}
+                       for term in split_terms(expert.get_tadirah(formated=False)))
+    if knows_about:
+        node["knowsAbout"] = knows_about
+
+    return node
+
+
+def expert_to_jsonld_string(expert: "Expert") -> str:
+    """
+    Serialisiert einen Experten als JSON-LD-Dokument mit dem vorberechneten Kontext, etwa für die Einbettung in die
+    Personenseite.
+
+    Args:
+        expert: Das Expertenobjekt.
+    Returns:
+        Das JSON-LD-Dokument als String.
+    """
+    # "</" wird maskiert, damit das Dokument in einem script-Element eingebettet werden kann.
+    body = json.dumps(expert_to_jsonld(expert), ensure_ascii=False).replace("</", "<\\/")
+    return f'{{"@context": {_CONTEXT_JSON}, {body[1:]}'
+
+
+def expert_to_ntriples(expert: "Expert", graph: str | None = None,
+                       seen_nodes: set[str] | None = None) -> Iterator[str]:
+    """
+    Erzeugt die Tripel eines Experten zeilenweise im Format N-Triples bzw. N-Quads.
+
+    Args:
+        expert: Das Expertenobjekt.
+        graph: Die IRI des benannten Graphen; wenn angegeben, werden N-Quads erzeugt.
+        seen_nodes: Die Organisationen und TaDiRAH-Begriffe, die im Dokument bereits beschrieben wurden. Die Menge
+            wird ergänzt, damit jeder Knoten nur einmal beschrieben wird.
+    Yields:
+        Die Zeilen des Dokuments einschließlich Zeilenumbruch.
+    """
+    end = f" <{graph}> .\n" if graph else " .\n"
+    subject = f"<{ORCID_DOMAIN}{expert.get_orcid()}>"
+    given_name, family_name = expert.get_name(formated=False)
+
+    yield f"{subject} {_RDF_TYPE} {_IRI['Person']}{end}"
+    yield f"{subject} {_IRI['name']} {_literal(expert.get_name())}{end}"
+    if given_name:
+        yield f"{subject} {_IRI['givenName']} {_literal(given_name)}{end}"
+    if family_name:
+        yield f"{subject} {_IRI['familyName']} {_literal(family_name)}{end}"
+    yield f"{subject} {_IRI['identifier']} {_literal(expert.get_orcid())}{end}"
+    if expert.get_mail():
+        yield f"{subject} {_IRI['email']} {_literal(expert.get_mail())}{end}"
+
+    for i, (key, name) in enumerate(expert.get_organisation_qids().items()):
+        iri = _organisation_iri(key)
+        if iri:
+            organisation = f"<{iri}>"
+        else:
+            organisation = f"_:org-{_BLANK_NODE_INVALID.sub('-', expert.get_orcid())}-{i}"
+        yield f"{subject} {_IRI['affiliation']} {organisation}{end}"
+        if seen_nodes is None or organisation not in seen_nodes:
+            yield f"{organisation} {_RDF_TYPE} {_IRI['Organization']}{end}"
+            yield f"{organisation} {_IRI['name']} {_literal(name)}{end}"
+            if seen_nodes is not None:
+                seen_nodes.add(organisation)
+
+    for keyword in split_terms(expert.get_research_interest(formated=False)):
+        yield f"{subject} {_IRI['knowsAbout']} {_literal(keyword)}{end}"
+
+    for term in split_terms(expert.get_tadirah(formated=False)):
+        node = _tadirah_node(term)
+        yield f"{subject} {_IRI['knowsAbout']} {node}{end}"
+        if seen_nodes is None or node not in seen_nodes:
+            yield f"{node} {_RDF_TYPE} {_IRI['DefinedTerm']}{end}"
+            yield f"{node} {_IRI['name']} {_literal(term)}{end}"
+            yield f"{node} {_IRI['inDefinedTermSet']} {_TADIRAH_SET}{end}"
+            if seen_nodes is not None:
+                seen_nodes.add(node)
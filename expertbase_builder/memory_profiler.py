@@ -0,0 +1,165 @@
+import logging
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Auf Windows ist das Modul resource nicht verfügbar.
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """
+    Wird ausgelöst, wenn der Build das konfigurierte Speicherbudget überschreitet und der Modus "fail" gesetzt ist.
+    """
+
+
+def get_peak_rss_mb() -> float | None:
+    """
+    Gibt den bisherigen Spitzenwert des Resident Set Size des Prozesses in MiB zurück.
+
+    Returns:
+        Den Spitzenwert in MiB oder None, wenn er auf dem System nicht ermittelt werden kann.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux gibt den Wert in KiB an, macOS in Byte.
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class MemoryProfiler:
+    """
+    Objekte dieser Klasse messen den Speicherverbrauch des Builds pro Verarbeitungsschritt.
+
+    Für jeden Schritt wird ein tracemalloc-Snapshot erstellt und mit dem vorherigen verglichen. Die Aufrufstellen mit
+    dem größten Speicherzuwachs, der Spitzenwert der verfolgten Allokationen und der Spitzenwert des RSS werden in das
+    Log geschrieben. Optional wird nach jedem Schritt ein Speicherbudget in MiB geprüft; bei Überschreitung wird je nach
+    Modus gewarnt ("warn") oder eine MemoryBudgetExceeded-Exception ausgelöst ("fail").
+    """
+
+    def __init__(self, enabled: bool = True, budget_mb: float | None = None, budget_mode: str = "warn",
+                 top_n: int = 10):
+        """
+        Der Konstruktor der Klasse.
+
+        Args:
+            enabled: Wenn False, werden keine Snapshots erstellt; ein gesetztes Budget wird dennoch über den RSS geprüft.
+            budget_mb: Das Speicherbudget in MiB oder None, wenn kein Budget gelten soll.
+            budget_mode: "warn" oder "fail".
+            top_n: Die Zahl der Aufrufstellen, die pro Schritt berichtet werden.
+        """
+        if budget_mode not in ("warn", "fail"):
+            raise ValueError(f"Ungültiger Modus für das Speicherbudget: {budget_mode}")
+
+        self.enabled = enabled
+        self.budget_mb = budget_mb
+        self.budget_mode = budget_mode
+        self.top_n = top_n
+        self._last_snapshot = None
+
+    def start(self) -> None:
+        """
+        Startet die Aufzeichnung der Allokationen.
+        """
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._last_snapshot = MemoryProfiler._take_snapshot()
+
+    def stop(self) -> None:
+        """
+        Beendet die Aufzeichnung und schreibt die Spitzenwerte des gesamten Builds in das Log.
+        """
+        if self.enabled and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            logger.info(f"Speicher: Spitzenwert der verfolgten Allokationen im gesamten Build: {peak / (1024 * 1024):.1f} MiB.")
+
+        peak_rss = get_peak_rss_mb()
+        if (self.enabled or self.budget_mb is not None) and peak_rss is not None:
+            logger.info(f"Speicher: Spitzenwert des RSS im gesamten Build: {peak_rss:.1f} MiB.")
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Kontextmanager, der den Speicherverbrauch eines Verarbeitungsschritts misst.
+
+        Args:
+            name: Der Name des Verarbeitungsschritts für das Log.
+        """
+        yield
+
+        if self.enabled and tracemalloc.is_tracing():
+            self._report_stage(name)
+
+        if self.enabled or self.budget_mb is not None:
+            self.check_budget(name)
+
+    def _report_stage(self, name: str) -> None:
+        """
+        Vergleicht den aktuellen Snapshot mit dem vorherigen und schreibt die größten Allokationen in das Log.
+
+        Args:
+            name: Der Name des Verarbeitungsschritts.
+        """
+        snapshot = MemoryProfiler._take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+
+        logger.info(f"Speicher nach Schritt '{name}': aktuell {current / (1024 * 1024):.1f} MiB, "
+                    f"Spitzenwert {peak / (1024 * 1024):.1f} MiB (tracemalloc).")
+
+        if self._last_snapshot is not None:
+            statistics = snapshot.compare_to(self._last_snapshot, "lineno")
+        else:
+            statistics = snapshot.statistics("lineno")
+
+        for stat in statistics[:self.top_n]:
+            logger.info(f"Speicher [{name}]: {stat}")
+
+        self._last_snapshot = snapshot
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """
+        Erstellt einen Snapshot ohne die Allokationen von tracemalloc selbst und des Import-Mechanismus.
+        """
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def check_budget(self, name: str) -> None:
+        """
+        Prüft den Spitzenwert des RSS gegen das Speicherbudget.
+
+        Args:
+            name: Der Name des Verarbeitungsschritts, nach dem geprüft wird.
+        Raises:
+            MemoryBudgetExceeded: Wenn das Budget überschritten ist und der Modus "fail" gesetzt ist.
+        """
+        peak_rss = get_peak_rss_mb()
+
+        if peak_rss is not None:
+            logger.info(f"Speicher nach Schritt '{name}': Spitzenwert des RSS {peak_rss:.1f} MiB.")
+
+        if self.budget_mb is None:
+            return
+
+        if peak_rss is None:
+            logger.warning("Das Speicherbudget kann auf diesem System nicht geprüft werden.")
+            return
+
+        if peak_rss > self.budget_mb:
+            message = (f"Das Speicherbudget von {self.budget_mb:.1f} MiB wurde nach Schritt '{name}' überschritten "
+                       f"(Spitzenwert des RSS {peak_rss:.1f} MiB).")
+            if self.budget_mode == "fail":
+                logger.error(message)
+                raise MemoryBudgetExceeded(message)
+            logger.warning(message)
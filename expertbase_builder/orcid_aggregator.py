@@ -1,13 +1,23 @@
 import csv
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from typing import Iterator
 
 import requests
 
+from . import http_transport
+from .shared_cache import SharedCache
+
 BASE_URL = "https://pub.orcid.org/v3.0/"
 
 logger = logging.getLogger(__name__)
 
+# Gemeinsamer Zwischenspeicher für die Antworten der ORCID-API. Er wird nur beim Bau mehrerer Expertbases in einem
+# Prozess aktiviert, da ein einzelner Build jede ORCID nur einmal abfragt.
+orcid_cache = SharedCache("ORCID", enabled=False)
+
 def read_orcids_from_csv(file_path: str) -> list[str]:
     """
     Liest ORCID-Bezeichner aus der zweiten Spalte einer CSV-Datei ein.
@@ -33,17 +43,63 @@ def read_orcids_from_csv(file_path: str) -> list[str]:
 
 def fetch_orcid_data(orcid: str, endpoint: str) -> dict | None:
     """
-    Fragt Daten für eine Person über die ORCID API ab.
+    Fragt Daten für eine Person über die ORCID API ab. Ist der Zwischenspeicher aktiviert, werden erfolgreiche
+    Antworten gespeichert, sodass mehrere Expertbases in einem Prozess dieselbe ORCID nur einmal abfragen.
+
+    Args:
+        orcid: ORCID-Bezeichner.
+        endpoint: Der Endpunkt, der abgefragt werden soll.
+    Returns:
+        ORCID-Daten als Dictionary oder None bei Fehler.
+    """
+    return orcid_cache.get_or_compute((orcid, endpoint), lambda: _request_orcid_data(orcid, endpoint))
+
+def fetch_orcid_records(orcids: list[str]) -> Iterator[tuple[str, dict | None, dict | None]]:
+    """
+    Fragt die Endpunkte /person und /activities für mehrere ORCIDs nebenläufig ab. Die Zahl der gleichzeitigen
+    Anfragen an die ORCID API wird von der HTTP-Transportschicht an Latenz und Fehlerrate angepasst.
+
+    Args:
+        orcids: Liste der ORCID-Bezeichner.
+    Yields:
+        Tripel aus ORCID, /person-Daten und /activities-Daten in der Reihenfolge der Eingabe.
+    """
+    def fetch(orcid: str) -> tuple[str, dict | None, dict | None]:
+        logger.info(f"Abfrage von ORCID {orcid}...")
+        return orcid, fetch_orcid_data(orcid, endpoint="person"), fetch_orcid_data(orcid, endpoint="activities")
+
+    with ThreadPoolExecutor(max_workers=http_transport.MAX_CONCURRENCY) as executor:
+        yield from executor.map(fetch, orcids)
+
+def _request_orcid_data(orcid: str, endpoint: str, max_retries: int = 5) -> dict | None:
+    """
+    Stellt die Anfrage an die ORCID API ohne Zwischenspeicher. Bei einem 429-Rate-Limit-Fehler wird mit
+    exponentiellem Backoff erneut angefragt.
 
     Args:
         orcid: ORCID-Bezeichner.
         endpoint: Der Endpunkt, der abgefragt werden soll.
+        max_retries: Anzahl der Wiederholungsversuche bei 429.
     Returns:
         ORCID-Daten als Dictionary oder None bei Fehler.
     """
     headers = {"Accept": "application/json"}
     url = f"{BASE_URL}{orcid}/{endpoint}"
-    response = requests.get(url, headers=headers)
+    backoff = 1  # Sekunden
+
+    for _ in range(max_retries + 1):
+        try:
+            response = http_transport.get(url, headers=headers)
+        except requests.RequestException as e:
+            logger.warning(f"Fehler beim Abrufen von ORCID {orcid}: {e}")
+            return None
+
+        if response.status_code != 429:
+            break
+
+        logger.warning(f"HTTP-Statuscode 429 Too Many Requests für ORCID {orcid} – Warte {backoff} Sekunden...")
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 60)  # Max. 1 Minute warten
 
     if response.status_code == 200:
         return response.json()
@@ -0,0 +1,259 @@
+import csv
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+QID_PATTERN = re.compile(r"^Q\d+$")
+
+# Abkürzungen und Übersetzungen, die auf eine gemeinsame Schreibung abgebildet werden.
+TOKEN_SYNONYMS = {
+    "univ": "universitat",
+    "uni": "universitat",
+    "university": "universitat",
+    "universite": "universitat",
+    "universita": "universitat",
+    "universidad": "universitat",
+    "universiteit": "universitat",
+    "inst": "institut",
+    "institute": "institut",
+    "institution": "institut",
+    "akad": "akademie",
+    "academy": "akademie",
+    "acad": "akademie",
+    "hs": "hochschule",
+    "bibl": "bibliothek",
+    "library": "bibliothek",
+    "ctr": "zentrum",
+    "center": "zentrum",
+    "centre": "zentrum",
+}
+
+# Füllwörter, die für den Vergleich von Organisationsnamen keine Rolle spielen.
+STOPWORDS = {"zu", "of", "the", "der", "die", "das", "des", "fur", "for", "and", "und", "de", "la", "di", "at", "in",
+             "e", "v", "ev"}
+
+# Länderangaben, die am Ende eines Organisationsnamens entfernt werden.
+COUNTRIES = {"germany", "deutschland", "austria", "osterreich", "switzerland", "schweiz", "suisse", "france",
+             "italy", "italia", "spain", "espana", "netherlands", "nederland", "belgium", "belgien", "luxembourg",
+             "denmark", "sweden", "norway", "finland", "poland", "czechia", "uk", "usa", "us"}
+
+_TRAILING_SEGMENT = re.compile(r"\s*(?:,\s*([^,()]+)|\(\s*([^()]+)\s*\))\s*$")
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def _tokenize(text: str) -> set[str]:
+    """
+    Zerlegt einen Text in normalisierte Tokens ohne Füllwörter.
+
+    Args:
+        text: Der Text.
+    Returns:
+        Die normalisierten Tokens als Menge.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+    tokens = set()
+    for token in _TOKEN_SPLIT.split(text):
+        if not token:
+            continue
+        # Umschreibungen der Umlaute ("Universitaet") auf die Schreibung ohne Diakritika abbilden.
+        token = token.replace("ae", "a").replace("oe", "o").replace("ue", "u")
+        token = TOKEN_SYNONYMS.get(token, token)
+        if token not in STOPWORDS:
+            tokens.add(token)
+
+    return tokens
+
+
+def normalize_organisation_name(name: str) -> tuple[str, ...]:
+    """
+    Normalisiert einen Organisationsnamen zu einer sortierten Menge von Tokens.
+
+    Groß- und Kleinschreibung, Diakritika und ihre Umschreibungen, Satzzeichen, Leerraum, Füllwörter und gängige
+    Abkürzungen ("Univ." für "Universität") werden vereinheitlicht. Ein nachgestelltes Segment nach einem Komma oder
+    in Klammern wird nur entfernt, wenn es ein Land nennt oder einen Ort wiederholt, der bereits im Namen steht, wie
+    in "University of Cologne, Cologne". Andere Segmente, etwa "University of California, Irvine", bleiben Teil des
+    Namens.
+
+    Args:
+        name: Der Organisationsname.
+    Returns:
+        Die normalisierten Tokens als sortiertes Tupel.
+    """
+    name = name.strip()
+
+    while True:
+        match = _TRAILING_SEGMENT.search(name)
+        if not match or match.start() == 0:
+            break
+
+        segment = _tokenize(match.group(1) or match.group(2))
+        rest = _tokenize(name[:match.start()])
+        if not segment or not (segment <= rest or segment <= COUNTRIES):
+            break
+
+        name = name[:match.start()]
+
+    return tuple(sorted(_tokenize(name)))
+
+
+class OrganisationIndex:
+    """
+    Objekte dieser Klasse bilden Organisationsnamen lokal auf Wikidata-QIDs ab.
+
+    Die Namen werden normalisiert und Schreibvarianten über die Jaccard-Ähnlichkeit ihrer Tokens zusammengeführt. Die
+    Kandidaten für den Vergleich werden über einen invertierten Index der Tokens bestimmt. Nur Namen, die weder exakt
+    noch über eine ähnliche Schreibung aufgelöst werden können, werden an Wikidata weitergegeben.
+
+    Die Objektvariable "entries" bildet die normalisierten Tokens auf den Schlüssel der Organisation ab; der Schlüssel
+    ist die QID oder, falls keine QID bekannt ist, die zuerst gesehene Schreibung des Namens.
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        """
+        Der Konstruktor der Klasse.
+
+        Args:
+            threshold: Die minimale Jaccard-Ähnlichkeit, ab der zwei Namen als dieselbe Organisation gelten.
+        """
+        self.threshold = threshold
+        self.entries = {}
+        self._postings = {}
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.remote_lookups = 0
+
+    def load_table(self, path: str) -> None:
+        """
+        Lädt eine Zuordnungstabelle aus einer CSV-Datei nach dem Muster:\n
+        |  Name  | QID |\n
+        | (...)  | Q(...) |
+
+        Args:
+            path: Der Dateipfad zu der CSV-Datei.
+        """
+        count = 0
+
+        try:
+            with open(path, newline='', encoding='utf-8') as csvfile:
+                reader = csv.reader(csvfile)
+                next(reader)
+                for row in reader:
+                    if len(row) < 2 or not row[0].strip() or not QID_PATTERN.match(row[1].strip()):
+                        continue
+                    self.add(row[0], row[1].strip())
+                    count += 1
+        except IOError as e:
+            logger.error(f"Die Datei {path} konnte nicht geöffnet werden:\n {e}")
+            raise
+
+        logger.info(f"{count} Organisationsnamen wurden aus {path} in den Organisationsindex geladen.")
+
+    def add(self, name: str, key: str) -> None:
+        """
+        Fügt einen Organisationsnamen mit seinem Schlüssel in den Index ein.
+
+        Args:
+            name: Der Organisationsname.
+            key: Die QID oder ein anderer Schlüssel für die Organisation.
+        """
+        tokens = normalize_organisation_name(name)
+        if not tokens:
+            return
+
+        with self._lock:
+            self._add(tokens, key)
+
+    def _add(self, tokens: tuple[str, ...], key: str) -> None:
+        """
+        Fügt normalisierte Tokens in den Index ein; der Aufrufer hält die Sperre.
+        """
+        if tokens in self.entries:
+            return
+
+        self.entries[tokens] = key
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(tokens)
+
+    def lookup(self, name: str) -> str | None:
+        """
+        Sucht den Schlüssel einer Organisation im Index, zuerst exakt und dann über ähnliche Schreibungen.
+
+        Args:
+            name: Der Organisationsname.
+        Returns:
+            Den Schlüssel der Organisation oder None, wenn der Name nicht aufgelöst werden kann.
+        """
+        tokens = normalize_organisation_name(name)
+        if not tokens:
+            return None
+
+        with self._lock:
+            return self._lookup(tokens)
+
+    def _lookup(self, tokens: tuple[str, ...]) -> str | None:
+        """
+        Sucht normalisierte Tokens im Index; der Aufrufer hält die Sperre.
+        """
+        if tokens in self.entries:
+            return self.entries[tokens]
+
+        shared = Counter()
+        for token in tokens:
+            shared.update(self._postings.get(token, ()))
+
+        best_key, best_score = None, 0.0
+        for candidate, overlap in shared.items():
+            score = overlap / (len(tokens) + len(candidate) - overlap)
+            if score > best_score:
+                best_key, best_score = self.entries[candidate], score
+
+        if best_score >= self.threshold:
+            return best_key
+        return None
+
+    def resolve(self, name: str, fallback: Callable[[str], str | None] | None = None) -> str:
+        """
+        Löst einen Organisationsnamen zu seinem Schlüssel auf. Nur wenn der Index den Namen nicht kennt, wird die
+        Fallback-Funktion (etwa die Wikidata-Suche) aufgerufen; ihr Ergebnis wird in den Index übernommen, sodass
+        weitere Schreibvarianten lokal aufgelöst werden. Schlägt die Fallback-Funktion fehl, wird nichts übernommen,
+        damit der Name beim nächsten Aufruf erneut abgefragt wird.
+
+        Args:
+            name: Der Organisationsname.
+            fallback: Funktion, die einen Namen auf eine QID, auf den Namen selbst (kein Treffer) oder bei einem Fehler
+                auf None abbildet.
+        Returns:
+            Die QID, den Schlüssel einer bereits bekannten Schreibvariante oder den Namen selbst.
+        """
+        key = self.lookup(name)
+        if key is not None:
+            with self._lock:
+                self.local_hits += 1
+            return key
+
+        if fallback is None:
+            return name
+
+        with self._lock:
+            self.remote_lookups += 1
+        key = fallback(name)
+        if key is None:
+            return name
+
+        self.add(name, key)
+
+        return key
+
+    def log_stats(self) -> None:
+        """
+        Schreibt die Zahl der lokal und der über Wikidata aufgelösten Namen in das Log.
+        """
+        logger.info(f"Organisationsindex: {self.local_hits} Namen lokal aufgelöst, {self.remote_lookups} Namen an "
+                    f"Wikidata weitergegeben, {len(self.entries)} Schreibungen im Index.")
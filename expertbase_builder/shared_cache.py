@@ -0,0 +1,84 @@
+import logging
+import threading
+from typing import Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCache:
+    """
+    Objekte dieser Klasse sind threadsichere Zwischenspeicher, die sich alle Expertbases eines Prozesses teilen.
+
+    Wird derselbe Schlüssel von mehreren Threads gleichzeitig angefragt, berechnet nur der erste Thread den Wert; die
+    übrigen warten auf dessen Ergebnis. Ergebnisse mit dem Wert None werden nicht gespeichert, damit fehlgeschlagene
+    Abfragen beim nächsten Aufruf wiederholt werden. Ist der Zwischenspeicher deaktiviert, wird jeder Wert neu
+    berechnet und nichts gespeichert.
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        """
+        Der Konstruktor der Klasse.
+
+        Args:
+            name: Der Name des Zwischenspeichers für das Log.
+            enabled: Wenn False, werden die Werte nicht gespeichert.
+        """
+        self.name = name
+        self.enabled = enabled
+        self._values = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """
+        Gibt den gespeicherten Wert für einen Schlüssel zurück oder berechnet und speichert ihn.
+
+        Args:
+            key: Der Schlüssel des Werts.
+            compute: Funktion ohne Argumente, die den Wert berechnet.
+        Returns:
+            Den gespeicherten oder neu berechneten Wert.
+        """
+        if not self.enabled:
+            return compute()
+
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Ein anderer Thread kann den Wert in der Zwischenzeit berechnet haben.
+            with self._lock:
+                if key in self._values:
+                    self.hits += 1
+                    return self._values[key]
+                self.misses += 1
+
+            value = compute()
+
+            with self._lock:
+                if value is not None:
+                    self._values[key] = value
+                self._key_locks.pop(key, None)
+
+        return value
+
+    def clear(self) -> None:
+        """
+        Leert den Zwischenspeicher.
+        """
+        with self._lock:
+            self._values.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def log_stats(self) -> None:
+        """
+        Schreibt die Zahl der Treffer und Fehlschläge in das Log.
+        """
+        logger.info(f"Zwischenspeicher '{self.name}': {self.hits} Treffer, {self.misses} Abfragen, "
+                    f"{len(self._values)} Einträge.")